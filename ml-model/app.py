@@ -1,140 +1,375 @@
 #!/usr/bin/env python3
 """
-MindGuard ML API - Flask application for mental health risk prediction
+MindGuard ML API - Quart (ASGI) application for mental health risk prediction
+
+Run with:
+    uvicorn app:app --workers 4 --loop uvloop --http httptools
 """
 
 import os
 import pickle
+import hashlib
+import operator
+import asyncio
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 import numpy as np
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+import orjson
+from quart import Quart, current_app, request, jsonify
+from quart.json.provider import JSONProvider
+from quart_cors import cors
 import logging
-from datetime import datetime
 import joblib
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-CORS(app)
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, which also serializes NumPy values"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response without a str round-trip;
+        # arguments are interpreted like jsonify(): one value, several, or keywords
+        if args and kwargs:
+            raise TypeError("jsonify() takes either args or kwargs, not both")
+        obj = args[0] if len(args) == 1 else (list(args) if args else kwargs or None)
+        return current_app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+            mimetype='application/json'
+        )
+
+app = Quart(__name__)
+app.json = ORJSONProvider(app)
+app = cors(app)
+
+# Valid range of each feature, in input order:
+# sleep_hours, anxiety_level, stress_frequency, financial_stress, social_support,
+# work_life_balance, physical_activity, substance_use, mood_changes, suicidal_thoughts
+FEATURE_MIN = np.array([0, 1, 1, 1, 1, 1, 1, 1, 1, 1], dtype=float)
+FEATURE_MAX = np.array([12, 10, 10, 10, 10, 10, 10, 10, 10, 10], dtype=float)
+
+# Model class index -> risk level
+RISK_LEVELS = ('Low Risk', 'Medium Risk', 'High Risk')
+
+# Request batching: concurrent /predict calls are stacked into one model call.
+# The forest's predict_proba sums tree outputs into a single (batch, n_classes)
+# buffer, so batch memory does not grow with the number of trees.
+MAX_BATCH = int(os.environ.get('MAX_BATCH', 32))
+BATCH_WAIT_SECONDS = 0.005
+PREDICT_TIMEOUT_SECONDS = 1.0
+
+# Identical feature vectors are common from the assessment form, so recent
+# predictions are kept in memory and served without touching the model
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 8192))
+
+# Shipped model artifacts: each file must match its BLAKE2b hash when one is set.
+# Once model.pkl is pinned, the ONNX and Treelite exports are only loaded if
+# they are pinned too, so an unverified file can never override the pickle.
+# Training a model at startup is opt-in via ALLOW_TRAIN=1.
+EXPECTED_MODEL_HASH = os.environ.get('MODEL_BLAKE2', '')
+EXPECTED_ONNX_HASH = os.environ.get('MODEL_ONNX_BLAKE2', '')
+EXPECTED_TL_HASH = os.environ.get('MODEL_TL_BLAKE2', '')
+ALLOW_TRAIN = os.environ.get('ALLOW_TRAIN', '0') == '1'
 
 # Global model variable
 model = None
-scaler = None
+model_backend = None
+onnx_session = None
+treelite_predictor = None
+
+_pending = queue.Queue()
+_batch_thread = None
+
+# Response timestamp, formatted at most once per wall-clock second
+_timestamp_second = 0
+_timestamp_str = ''
+
+class ModelIntegrityError(RuntimeError):
+    """A model artifact does not match its expected hash"""
+
+def stream_blake2b(f):
+    """Hex BLAKE2b digest of an open binary file, read in chunks from its start"""
+    digest = hashlib.blake2b()
+    f.seek(0)
+    for chunk in iter(lambda: f.read(1 << 20), b''):
+        digest.update(chunk)
+    f.seek(0)
+    return digest.hexdigest()
+
+def wants_artifact(path, expected_hash, env_name):
+    """Return True if a fast-backend artifact exists and may be loaded under the pinning rules"""
+    if not os.path.exists(path):
+        return False
+    if not expected_hash and EXPECTED_MODEL_HASH:
+        logger.warning(f"Skipping {path}: {env_name} is not set")
+        return False
+    return True
+
+def check_artifact_hash(path, artifact_hash, expected_hash, env_name):
+    """Raise ModelIntegrityError if an artifact's hash does not match its pinned value"""
+    if expected_hash and artifact_hash != expected_hash:
+        raise ModelIntegrityError(f"{path} hash {artifact_hash} does not match {env_name}")
 
 def load_model():
-    """Load the trained model and scaler"""
-    global model, scaler
+    """Load the trained model and any exported fast inference backends"""
+    global model, model_backend, onnx_session, treelite_predictor
     
     try:
         # Try to load existing model
-        if os.path.exists('model.pkl'):
-            model = joblib.load('model.pkl')
-            logger.info("✅ Loaded existing model from model.pkl")
-        else:
+        from_pickle = os.path.exists('model.pkl')
+        if from_pickle and os.path.exists('scaler.pkl'):
+            # Older artifacts trained the forest on standardized inputs; the API now
+            # feeds raw features, so that model would silently mispredict
+            raise ModelIntegrityError(
+                "scaler.pkl found next to model.pkl: this model expects scaled inputs, "
+                "retrain with train_model.py and remove scaler.pkl"
+            )
+        if from_pickle:
+            with open('model.pkl', 'rb') as f:
+                model_hash = stream_blake2b(f)
+                if EXPECTED_MODEL_HASH and model_hash != EXPECTED_MODEL_HASH:
+                    raise ModelIntegrityError(f"model.pkl hash {model_hash} does not match MODEL_BLAKE2")
+                
+                # Unpickle from the handle that was hashed. model.pkl is compressed and
+                # never memory-mapped: Tree.__setstate__ copies the node arrays anyway,
+                # and joblib can only mmap by path, which would reopen an unverified file.
+                model = joblib.load(f)
+            logger.info(f"✅ Loaded existing model from model.pkl (blake2b {model_hash})")
+            
+            # joblib's thread pool costs more than it saves on single-row predictions
+            model.n_jobs = 1
+        elif ALLOW_TRAIN:
             # Create and train a new model if none exists
             logger.info("📚 No existing model found, creating new model...")
             model = create_and_train_model()
-            
-        # Try to load scaler
-        if os.path.exists('scaler.pkl'):
-            scaler = joblib.load('scaler.pkl')
-            logger.info("✅ Loaded existing scaler from scaler.pkl")
         else:
-            # Create new scaler if none exists
-            from sklearn.preprocessing import StandardScaler
-            scaler = StandardScaler()
-            # Fit with dummy data
-            dummy_data = np.array([[7, 5, 5, 5, 7, 5, 5, 2, 3, 1]])
-            scaler.fit(dummy_data)
-            joblib.dump(scaler, 'scaler.pkl')
-            logger.info("✅ Created and saved new scaler")
+            raise FileNotFoundError("model.pkl not found and ALLOW_TRAIN is not set")
             
+        model_backend = 'sklearn'
+        
+        # Exports on disk belong to a previous training run, not a freshly trained model
+        if not from_pickle:
+            logger.warning("Skipping model.onnx / model_tl.so for a model trained at startup")
+        
+        # Prefer the ONNX export of the forest for inference when available
+        if from_pickle and wants_artifact('model.onnx', EXPECTED_ONNX_HASH, 'MODEL_ONNX_BLAKE2'):
+            # Hash and load the same bytes so the file cannot change in between
+            with open('model.onnx', 'rb') as f:
+                onnx_bytes = f.read()
+            check_artifact_hash('model.onnx', hashlib.blake2b(onnx_bytes).hexdigest(),
+                                EXPECTED_ONNX_HASH, 'MODEL_ONNX_BLAKE2')
+            try:
+                import onnxruntime as ort
+                onnx_session = ort.InferenceSession(onnx_bytes, providers=['CPUExecutionProvider'])
+                model_backend = 'onnx'
+                logger.info("✅ Loaded ONNX model from model.onnx")
+            except Exception as e:
+                logger.warning(f"ONNX runtime unavailable, using sklearn model: {e}")
+                onnx_session = None
+        
+        # Natively compiled forest takes precedence over ONNX
+        if from_pickle and wants_artifact('model_tl.so', EXPECTED_TL_HASH, 'MODEL_TL_BLAKE2'):
+            with open('model_tl.so', 'rb') as f:
+                check_artifact_hash('model_tl.so', stream_blake2b(f), EXPECTED_TL_HASH, 'MODEL_TL_BLAKE2')
+                
+                # dlopen the verified inode through its descriptor rather than re-resolving
+                # the path; without /proc a pinned library cannot be loaded safely
+                fd_path = f'/proc/self/fd/{f.fileno()}'
+                if os.path.exists(fd_path):
+                    library_path = fd_path
+                elif EXPECTED_TL_HASH:
+                    library_path = None
+                    logger.warning("Skipping model_tl.so: cannot load it through a verified descriptor")
+                else:
+                    library_path = './model_tl.so'
+                
+                if library_path:
+                    try:
+                        import tl2cgen
+                        treelite_predictor = tl2cgen.Predictor(library_path)
+                        model_backend = 'treelite'
+                        logger.info("✅ Loaded compiled Treelite model from model_tl.so")
+                    except Exception as e:
+                        logger.warning(f"Treelite runtime unavailable: {e}")
+                        treelite_predictor = None
+            
+    except ModelIntegrityError as e:
+        # Never serve anything when a shipped artifact fails verification
+        logger.error(f"❌ Model integrity check failed: {str(e)}")
+        raise
     except Exception as e:
         logger.error(f"❌ Error loading model: {str(e)}")
         # Create fallback model
         model = create_fallback_model()
+        model_backend = 'fallback'
+        onnx_session = None
+        treelite_predictor = None
+    
+    prediction_cache.clear()
+
+class PredictionCache:
+    """Least-recently-used cache of class probabilities keyed by feature bytes"""
+    
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+    
+    def get(self, key):
+        proba = self._entries.get(key)
+        if proba is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return proba
+    
+    def put(self, key, proba):
+        self._entries[key] = proba
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def info(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'maxsize': self.maxsize,
+            'currsize': len(self._entries)
+        }
+
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE)
+
+class PendingPrediction:
+    """A single queued /predict request waiting for its batch"""
+    __slots__ = ('features', 'future')
+    
+    def __init__(self, features):
+        self.features = features
+        self.future = Future()
+
+def start_batch_worker():
+    """Start the background batching thread if it is not already running"""
+    global _batch_thread
+    
+    if _batch_thread is not None and _batch_thread.is_alive():
+        return
+    
+    _batch_thread = threading.Thread(target=_batch_worker, args=(_pending,), daemon=True)
+    _batch_thread.start()
+
+def _batch_worker(pending):
+    """Drain pending requests into batches and run one prediction per batch"""
+    while True:
+        items = [pending.get()]
+        deadline = time.monotonic() + BATCH_WAIT_SECONDS
+        
+        while len(items) < MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        # Claim each future; requests that timed out were cancelled and are dropped
+        items = [item for item in items if item.future.set_running_or_notify_cancel()]
+        if not items:
+            continue
+        
+        try:
+            probas = predict_proba(np.vstack([item.features for item in items]))
+        except Exception as e:
+            for item in items:
+                item.future.set_exception(e)
+            continue
+        
+        for item, proba in zip(items, probas):
+            item.future.set_result(proba)
+
+def _reset_batch_worker():
+    """Give a forked child its own queue; the parent's thread and waiters do not survive the fork"""
+    global _pending, _batch_thread
+    _pending = queue.Queue()
+    _batch_thread = None
+
+os.register_at_fork(after_in_child=_reset_batch_worker)
+
+def submit_prediction(features_array):
+    """Queue a (1, 10) feature array for batched prediction and return its future"""
+    # Started lazily so the thread is always created in the serving process
+    start_batch_worker()
+    item = PendingPrediction(features_array)
+    _pending.put(item)
+    return item.future
+
+def predict_proba(features_array):
+    """Return class probabilities, using the fastest loaded backend"""
+    if treelite_predictor is not None:
+        import tl2cgen
+        dmat = tl2cgen.DMatrix(features_array.astype(np.float32, copy=False))
+        return treelite_predictor.predict(dmat).reshape(len(features_array), -1)
+    if onnx_session is not None:
+        return onnx_session.run(None, {'input': features_array.astype(np.float64)})[1]
+    return model.predict_proba(features_array)
+
+def decide(proba):
+    """Return (risk_level, confidence) for one row of class probabilities"""
+    prediction_class = int(proba.argmax())
+    return RISK_LEVELS[prediction_class], float(proba[prediction_class])
+
+def now_iso():
+    """Current UTC time as an ISO 8601 string with second resolution"""
+    global _timestamp_second, _timestamp_str
+    
+    second = int(time.time())
+    if second != _timestamp_second:
+        _timestamp_second = second
+        _timestamp_str = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(second))
+    return _timestamp_str
 
 def create_and_train_model():
     """Create and train a new model with synthetic data"""
     from sklearn.ensemble import RandomForestClassifier
-    from sklearn.preprocessing import StandardScaler
-    import numpy as np
     
     # Generate synthetic training data
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     n_samples = 1000
     
     # Features: sleep_hours, anxiety, stress, financial_stress, social_support,
     # work_life_balance, physical_activity, substance_use, mood_changes, suicidal_thoughts
-    X = []
-    y = []
-    
-    for _ in range(n_samples):
-        # Generate realistic feature combinations
-        sleep_hours = np.random.normal(7, 1.5)
-        sleep_hours = max(0, min(12, sleep_hours))
-        
-        anxiety = np.random.randint(1, 11)
-        stress = np.random.randint(1, 11)
-        financial_stress = np.random.randint(1, 11)
-        social_support = np.random.randint(1, 11)
-        work_life_balance = np.random.randint(1, 11)
-        physical_activity = np.random.randint(1, 11)
-        substance_use = np.random.randint(1, 11)
-        mood_changes = np.random.randint(1, 11)
-        suicidal_thoughts = np.random.randint(1, 11)
-        
-        features = [sleep_hours, anxiety, stress, financial_stress, social_support,
-                   work_life_balance, physical_activity, substance_use, mood_changes, suicidal_thoughts]
-        
-        # Calculate risk based on features (simplified logic)
-        risk_score = 0
-        
-        # Poor sleep increases risk
-        if sleep_hours < 6:
-            risk_score += 15
-        elif sleep_hours < 7:
-            risk_score += 8
-        elif sleep_hours > 9:
-            risk_score += 5
-            
-        # High anxiety, stress increase risk
-        risk_score += (anxiety - 1) * 2
-        risk_score += (stress - 1) * 2
-        risk_score += (financial_stress - 1) * 1.5
-        
-        # Low social support increases risk
-        risk_score += (10 - social_support) * 2
-        risk_score += (10 - work_life_balance) * 1.5
-        risk_score += (10 - physical_activity) * 1
-        
-        # Substance use and mood changes increase risk
-        risk_score += (substance_use - 1) * 3
-        risk_score += (mood_changes - 1) * 2
-        risk_score += (suicidal_thoughts - 1) * 5
-        
-        # Determine label
-        if risk_score <= 30:
-            label = 0  # Low Risk
-        elif risk_score <= 60:
-            label = 1  # Medium Risk
-        else:
-            label = 2  # High Risk
-            
-        X.append(features)
-        y.append(label)
+    X = np.empty((n_samples, 10), dtype=np.float32)
+    X[:, 0] = np.clip(rng.normal(7, 1.5, n_samples), 0, 12)
+    X[:, 1:] = rng.integers(1, 11, (n_samples, 9))
     
-    X = np.array(X)
-    y = np.array(y)
+    # Label from the risk score (simplified logic): <=30 Low, <=60 Medium, else High
+    y = np.digitize(calculate_risk_score(X), [30, 60], right=True)
     
     # Train model
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    n_estimators = int(os.environ.get('N_ESTIMATORS', 50))
+    model = RandomForestClassifier(n_estimators=n_estimators, n_jobs=-1, random_state=42)
     model.fit(X, y)
+    model.n_jobs = 1
     
     # Save model
-    joblib.dump(model, 'model.pkl')
+    joblib.dump(model, 'model.pkl', compress=3)
     logger.info("✅ Created and saved new model")
     
     return model
@@ -142,18 +377,18 @@ def create_and_train_model():
 def create_fallback_model():
     """Create a simple fallback model"""
     class FallbackModel:
+        # Probabilities for Low / Medium / High risk buckets
+        PROBA_TABLE = np.array([
+            [0.8, 0.15, 0.05],  # Low risk
+            [0.2, 0.7, 0.1],    # Medium risk
+            [0.1, 0.2, 0.7]     # High risk
+        ])
+        
         def predict_proba(self, X):
-            # Simple rule-based prediction
-            predictions = []
-            for features in X:
-                risk_score = calculate_risk_score(features)
-                if risk_score <= 30:
-                    predictions.append([0.8, 0.15, 0.05])  # Low risk
-                elif risk_score <= 60:
-                    predictions.append([0.2, 0.7, 0.1])   # Medium risk
-                else:
-                    predictions.append([0.1, 0.2, 0.7])   # High risk
-            return np.array(predictions)
+            # Simple rule-based prediction over the whole batch
+            risk_score = calculate_risk_score(X)
+            buckets = np.digitize(risk_score, [30, 60], right=True)
+            return self.PROBA_TABLE[buckets]
         
         def predict(self, X):
             probas = self.predict_proba(X)
@@ -162,39 +397,26 @@ def create_fallback_model():
     logger.info("✅ Created fallback model")
     return FallbackModel()
 
+# Linear part of the risk score: sum((features + offsets) * weights).
+# Columns: sleep_hours, anxiety, stress, financial_stress, social_support,
+# work_life_balance, physical_activity, substance_use, mood_changes, suicidal_thoughts
+RISK_WEIGHTS = np.array([0, 2, 2, 1.5, -2, -1.5, -1, 3, 2, 5])
+RISK_OFFSETS = np.array([0, -1, -1, -1, -10, -10, -10, -1, -1, -1])
+
+def sleep_bonus(sleep_hours):
+    """Risk added for too little or too much sleep (scalar or array)"""
+    return 15 * (sleep_hours < 6) + 8 * ((sleep_hours >= 6) & (sleep_hours < 7)) + 5 * (sleep_hours > 9)
+
 def calculate_risk_score(features):
-    """Calculate risk score from features"""
-    sleep_hours, anxiety, stress, financial_stress, social_support, \
-    work_life_balance, physical_activity, substance_use, mood_changes, suicidal_thoughts = features
-    
-    risk_score = 0
-    
-    # Sleep
-    if sleep_hours < 6:
-        risk_score += 15
-    elif sleep_hours < 7:
-        risk_score += 8
-    elif sleep_hours > 9:
-        risk_score += 5
-    
-    # Mental health factors
-    risk_score += (anxiety - 1) * 2
-    risk_score += (stress - 1) * 2
-    risk_score += (financial_stress - 1) * 1.5
-    risk_score += (10 - social_support) * 2
-    risk_score += (10 - work_life_balance) * 1.5
-    risk_score += (10 - physical_activity) * 1
-    risk_score += (substance_use - 1) * 3
-    risk_score += (mood_changes - 1) * 2
-    risk_score += (suicidal_thoughts - 1) * 5
-    
-    return risk_score
+    """Calculate risk score from features (a single row or an (n, 10) matrix)"""
+    features = np.asarray(features, dtype=float)
+    return sleep_bonus(features[..., 0]) + (features + RISK_OFFSETS) @ RISK_WEIGHTS
 
 @app.route('/predict', methods=['POST'])
-def predict():
+async def predict():
     """Predict mental health risk"""
     try:
-        data = request.json
+        data = await request.get_json()
         features = data.get('features', [])
         
         if len(features) != 10:
@@ -203,43 +425,29 @@ def predict():
             }), 400
         
         # Validate feature ranges
-        feature_ranges = [
-            (0, 12),   # sleep_hours
-            (1, 10),   # anxiety_level
-            (1, 10),   # stress_frequency
-            (1, 10),   # financial_stress
-            (1, 10),   # social_support
-            (1, 10),   # work_life_balance
-            (1, 10),   # physical_activity
-            (1, 10),   # substance_use
-            (1, 10),   # mood_changes
-            (1, 10)    # suicidal_thoughts
-        ]
-        
-        for i, (feature, (min_val, max_val)) in enumerate(zip(features, feature_ranges)):
-            if not (min_val <= feature <= max_val):
-                return jsonify({
-                    'error': f'Feature {i} out of range. Expected {min_val}-{max_val}, got {feature}'
-                }), 400
-        
-        # Prepare features for prediction
-        features_array = np.array([features])
+        features_array = np.asarray(features, dtype=float)
+        out_of_range = np.flatnonzero(~((features_array >= FEATURE_MIN) & (features_array <= FEATURE_MAX)))
+        if out_of_range.size:
+            i = int(out_of_range[0])
+            return jsonify({
+                'error': f'Feature {i} out of range. Expected {FEATURE_MIN[i]:g}-{FEATURE_MAX[i]:g}, got {features[i]}'
+            }), 400
         
-        # Scale features if scaler is available
-        if scaler:
-            try:
-                features_array = scaler.transform(features_array)
-            except Exception as e:
-                logger.warning(f"Scaler transform failed: {e}")
+        # Prepare features for prediction; the forest traverses float32 natively
+        features_array = features_array.reshape(1, -1).astype(np.float32)
         
-        # Make prediction
-        prediction_proba = model.predict_proba(features_array)[0]
-        prediction_class = np.argmax(prediction_proba)
+        # Make prediction off the event loop, batched with concurrent requests
+        cache_key = features_array.tobytes()
+        prediction_proba = prediction_cache.get(cache_key)
+        if prediction_proba is None:
+            prediction_proba = await asyncio.wait_for(
+                asyncio.wrap_future(submit_prediction(features_array)),
+                timeout=PREDICT_TIMEOUT_SECONDS
+            )
+            prediction_cache.put(cache_key, prediction_proba)
         
         # Map prediction to risk level
-        risk_levels = ['Low Risk', 'Medium Risk', 'High Risk']
-        risk_level = risk_levels[prediction_class]
-        confidence = float(prediction_proba[prediction_class])
+        risk_level, confidence = decide(prediction_proba)
         
         # Generate recommendations
         recommendations = generate_recommendations(features, risk_level)
@@ -248,76 +456,75 @@ def predict():
             'prediction': risk_level,
             'confidence': confidence,
             'recommendations': recommendations,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         }
         
         logger.info(f"Prediction made: {risk_level} (confidence: {confidence:.2f})")
         return jsonify(result)
         
+    except asyncio.TimeoutError:
+        logger.error(f"Prediction error: timed out after {PREDICT_TIMEOUT_SECONDS}s waiting for the model")
+        return jsonify({'error': 'Prediction timed out'}), 503
     except Exception as e:
         logger.error(f"Prediction error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-def generate_recommendations(features, risk_level):
-    """Generate personalized recommendations based on features and risk level"""
-    sleep_hours, anxiety, stress, financial_stress, social_support, \
-    work_life_balance, physical_activity, substance_use, mood_changes, suicidal_thoughts = features
-    
-    recommendations = []
-    
+# Recommendation rules as (feature index, comparison, threshold, text), in output order.
+# A feature index of None marks a rule that always applies.
+RECOMMENDATION_RULES = [
     # Sleep recommendations
-    if sleep_hours < 7:
-        recommendations.append("Aim for 7-9 hours of sleep per night for better mental health")
-    elif sleep_hours > 9:
-        recommendations.append("Consider evaluating sleep quality - too much sleep can indicate depression")
-    
+    (0, operator.lt, 7, "Aim for 7-9 hours of sleep per night for better mental health"),
+    (0, operator.gt, 9, "Consider evaluating sleep quality - too much sleep can indicate depression"),
     # Anxiety and stress recommendations
-    if anxiety >= 7:
-        recommendations.append("Practice anxiety management techniques like deep breathing or meditation")
-    if stress >= 7:
-        recommendations.append("Identify and address sources of stress in your life")
-    
+    (1, operator.ge, 7, "Practice anxiety management techniques like deep breathing or meditation"),
+    (2, operator.ge, 7, "Identify and address sources of stress in your life"),
     # Social support recommendations
-    if social_support <= 4:
-        recommendations.append("Strengthen your social connections - reach out to friends and family")
-    
+    (4, operator.le, 4, "Strengthen your social connections - reach out to friends and family"),
     # Physical activity recommendations
-    if physical_activity <= 4:
-        recommendations.append("Increase physical activity - even 30 minutes of walking can improve mood")
-    
+    (6, operator.le, 4, "Increase physical activity - even 30 minutes of walking can improve mood"),
     # Substance use recommendations
-    if substance_use >= 6:
-        recommendations.append("Consider reducing alcohol or substance use, which can worsen mental health")
-    
+    (7, operator.ge, 6, "Consider reducing alcohol or substance use, which can worsen mental health"),
     # Work-life balance recommendations
-    if work_life_balance <= 4:
-        recommendations.append("Work on improving work-life balance to reduce stress")
-    
-    # High-risk specific recommendations
-    if risk_level == 'High Risk':
-        recommendations.append("Strongly consider speaking with a mental health professional")
-        if suicidal_thoughts >= 6:
-            recommendations.append("If having thoughts of self-harm, contact a crisis helpline immediately")
-    elif risk_level == 'Medium Risk':
-        recommendations.append("Consider speaking with a counselor or therapist")
-    else:
-        recommendations.append("Continue maintaining healthy habits and monitor your mental health")
-    
+    (5, operator.le, 4, "Work on improving work-life balance to reduce stress"),
+]
+
+# Risk-level specific rules, appended after the feature rules
+RISK_LEVEL_RULES = {
+    'High Risk': [
+        (None, None, None, "Strongly consider speaking with a mental health professional"),
+        (9, operator.ge, 6, "If having thoughts of self-harm, contact a crisis helpline immediately"),
+    ],
+    'Medium Risk': [
+        (None, None, None, "Consider speaking with a counselor or therapist"),
+    ],
+    'Low Risk': [
+        (None, None, None, "Continue maintaining healthy habits and monitor your mental health"),
+    ],
+}
+
+def generate_recommendations(features, risk_level):
+    """Generate personalized recommendations based on features and risk level"""
+    rules = RECOMMENDATION_RULES + RISK_LEVEL_RULES.get(risk_level, RISK_LEVEL_RULES['Low Risk'])
+    recommendations = [
+        text for index, compare, threshold, text in rules
+        if index is None or compare(features[index], threshold)
+    ]
     return recommendations[:5]  # Limit to 5 recommendations
 
 @app.route('/health', methods=['GET'])
-def health_check():
+async def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
         'service': 'MindGuard ML API',
         'model_loaded': model is not None,
-        'scaler_loaded': scaler is not None,
-        'timestamp': datetime.now().isoformat()
+        'model_backend': model_backend,
+        'prediction_cache': prediction_cache.info(),
+        'timestamp': now_iso()
     })
 
 @app.route('/', methods=['GET'])
-def root():
+async def root():
     """Root endpoint"""
     return jsonify({
         'service': 'MindGuard ML API',
@@ -328,11 +535,12 @@ def root():
         }
     })
 
+# Load at import time so every server worker initializes the model once
+if model is None:
+    load_model()
+
 if __name__ == '__main__':
     print("🤖 MindGuard ML API starting...")
-    print("📚 Loading machine learning model...")
-    
-    load_model()
     
     if model is None:
         print("❌ Failed to load model")
@@ -343,5 +551,6 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('DEBUG', 'False').lower() == 'true'
     
+    # Development server only; use uvicorn (or gunicorn -c gunicorn.conf.py app:app) in production
     print(f"🚀 Starting server on port {port}")
     app.run(host='0.0.0.0', port=port, debug=debug)
\ No newline at end of file
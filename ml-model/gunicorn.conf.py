@@ -0,0 +1,17 @@
+"""
+Gunicorn configuration for the MindGuard ML API
+
+Run with:
+    gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Uvicorn (ASGI) workers so concurrent /predict calls share one event loop each
+workers = int(os.environ.get('WEB_CONCURRENCY', 2 * (os.cpu_count() or 1) + 1))
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+# Load the model once in the master and share it with forked workers
+preload_app = True
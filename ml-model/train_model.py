@@ -3,108 +3,152 @@
 Train and save the mental health risk prediction model
 """
 
+import os
+import hashlib
 import numpy as np
 import joblib
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# numba is optional; without it the NumPy implementation is used
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
 def generate_synthetic_data(n_samples=2000):
-    """Generate synthetic mental health data"""
-    np.random.seed(42)
-    
-    X = []
-    y = []
-    
-    for _ in range(n_samples):
-        # Generate realistic feature combinations
-        sleep_hours = np.random.normal(7, 1.5)
-        sleep_hours = max(0, min(12, sleep_hours))
-        
-        # Correlated features for more realistic data
-        base_stress = np.random.uniform(1, 10)
-        anxiety = np.random.normal(base_stress, 1.5)
-        anxiety = max(1, min(10, anxiety))
-        
-        stress = np.random.normal(base_stress, 1)
-        stress = max(1, min(10, stress))
-        
-        financial_stress = np.random.randint(1, 11)
-        
-        # Social support inversely correlated with stress
-        social_support = np.random.normal(10 - base_stress/2, 2)
-        social_support = max(1, min(10, social_support))
-        
-        work_life_balance = np.random.randint(1, 11)
-        physical_activity = np.random.randint(1, 11)
-        
-        # Substance use correlated with stress
-        substance_use = np.random.normal(1 + base_stress/3, 1.5)
-        substance_use = max(1, min(10, substance_use))
-        
-        mood_changes = np.random.normal(base_stress/2, 1.5)
-        mood_changes = max(1, min(10, mood_changes))
-        
-        # Suicidal thoughts rare but correlated with high stress/low support
-        if base_stress > 8 and social_support < 4:
-            suicidal_thoughts = np.random.randint(3, 8)
-        else:
-            suicidal_thoughts = np.random.randint(1, 4)
-        
-        features = [
-            sleep_hours, anxiety, stress, financial_stress, social_support,
-            work_life_balance, physical_activity, substance_use, mood_changes, suicidal_thoughts
-        ]
-        
-        # Calculate risk score
-        risk_score = calculate_risk_score(features)
-        
-        # Determine label with some noise
-        noise = np.random.normal(0, 5)
-        adjusted_score = risk_score + noise
-        
-        if adjusted_score <= 30:
-            label = 0  # Low Risk
-        elif adjusted_score <= 60:
-            label = 1  # Medium Risk
-        else:
-            label = 2  # High Risk
-        
-        X.append(features)
-        y.append(label)
-    
-    return np.array(X), np.array(y)
+    """Generate synthetic mental health data as a float32 (n_samples, 10) matrix and labels"""
+    rng = np.random.default_rng(42)
+    
+    # Columns: sleep_hours, anxiety, stress, financial_stress, social_support,
+    # work_life_balance, physical_activity, substance_use, mood_changes, suicidal_thoughts
+    X = np.empty((n_samples, 10), dtype=np.float32)
+    
+    # Generate realistic feature combinations, one column at a time
+    X[:, 0] = np.clip(rng.normal(7, 1.5, n_samples), 0, 12)
+    
+    # Correlated features for more realistic data
+    base_stress = rng.uniform(1, 10, n_samples)
+    X[:, 1] = np.clip(rng.normal(base_stress, 1.5), 1, 10)
+    X[:, 2] = np.clip(rng.normal(base_stress, 1), 1, 10)
+    
+    X[:, 3] = rng.integers(1, 11, n_samples)
+    
+    # Social support inversely correlated with stress
+    X[:, 4] = np.clip(rng.normal(10 - base_stress/2, 2), 1, 10)
+    
+    X[:, 5] = rng.integers(1, 11, n_samples)
+    X[:, 6] = rng.integers(1, 11, n_samples)
+    
+    # Substance use correlated with stress
+    X[:, 7] = np.clip(rng.normal(1 + base_stress/3, 1.5), 1, 10)
+    
+    X[:, 8] = np.clip(rng.normal(base_stress/2, 1.5), 1, 10)
+    
+    # Suicidal thoughts rare but correlated with high stress/low support
+    X[:, 9] = np.where(
+        (base_stress > 8) & (X[:, 4] < 4),
+        rng.integers(3, 8, n_samples),
+        rng.integers(1, 4, n_samples)
+    )
+    
+    # Calculate risk score for every sample at once
+    risk_score = risk_scores(X)
+    
+    # Determine label with some noise: <=30 Low, <=60 Medium, else High
+    noise = rng.normal(0, 5, n_samples)
+    y = np.digitize(risk_score + noise, [30, 60], right=True)
+    
+    return X, y
+
+# Linear part of the risk score: sum((features + offsets) * weights).
+# Columns: sleep_hours, anxiety, stress, financial_stress, social_support,
+# work_life_balance, physical_activity, substance_use, mood_changes, suicidal_thoughts
+RISK_WEIGHTS = np.array([0, 2, 2, 1.5, -2, -1.5, -1, 3, 2, 5])
+RISK_OFFSETS = np.array([0, -1, -1, -1, -10, -10, -10, -1, -1, -1])
+
+def sleep_bonus(sleep_hours):
+    """Risk added for too little or too much sleep (scalar or array)"""
+    return 15 * (sleep_hours < 6) + 8 * ((sleep_hours >= 6) & (sleep_hours < 7)) + 5 * (sleep_hours > 9)
 
 def calculate_risk_score(features):
-    """Calculate risk score from features"""
-    sleep_hours, anxiety, stress, financial_stress, social_support, \
-    work_life_balance, physical_activity, substance_use, mood_changes, suicidal_thoughts = features
-    
-    risk_score = 0
-    
-    # Sleep
-    if sleep_hours < 6:
-        risk_score += 15
-    elif sleep_hours < 7:
-        risk_score += 8
-    elif sleep_hours > 9:
-        risk_score += 5
-    
-    # Mental health factors
-    risk_score += (anxiety - 1) * 2
-    risk_score += (stress - 1) * 2
-    risk_score += (financial_stress - 1) * 1.5
-    risk_score += (10 - social_support) * 2
-    risk_score += (10 - work_life_balance) * 1.5
-    risk_score += (10 - physical_activity) * 1
-    risk_score += (substance_use - 1) * 3
-    risk_score += (mood_changes - 1) * 2
-    risk_score += (suicidal_thoughts - 1) * 5
-    
-    return risk_score
+    """Calculate risk score from features (a single row or an (n, 10) matrix)"""
+    features = np.asarray(features, dtype=float)
+    return sleep_bonus(features[..., 0]) + (features + RISK_OFFSETS) @ RISK_WEIGHTS
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def risk_scores(X):
+        """Calculate the risk score of every row of an (n, 10) matrix in parallel"""
+        n = X.shape[0]
+        out = np.empty(n)
+        for i in prange(n):
+            sleep_hours = X[i, 0]
+            risk_score = 0.0
+            
+            # Sleep
+            if sleep_hours < 6:
+                risk_score += 15
+            elif sleep_hours < 7:
+                risk_score += 8
+            elif sleep_hours > 9:
+                risk_score += 5
+            
+            # Mental health factors
+            for j in range(1, 10):
+                risk_score += (X[i, j] + RISK_OFFSETS[j]) * RISK_WEIGHTS[j]
+            
+            out[i] = risk_score
+        return out
+else:
+    risk_scores = calculate_risk_score
+
+def export_onnx(model, path='model.onnx'):
+    """Export the trained forest to ONNX for fast single-row inference"""
+    try:
+        from skl2onnx import convert_sklearn
+        from skl2onnx.common.data_types import DoubleTensorType
+    except ImportError:
+        print("⚠️ skl2onnx not installed, skipping ONNX export")
+        return None
+    
+    # Double-precision tree ensemble (ai.onnx.ml opset 3) so thresholds and the
+    # averaged probabilities match sklearn instead of being rounded to float32
+    onx = convert_sklearn(
+        model,
+        initial_types=[('input', DoubleTensorType([None, 10]))],
+        options={id(model): {'zipmap': False}},
+        target_opset={'': 17, 'ai.onnx.ml': 3}
+    )
+    with open(path, 'wb') as f:
+        f.write(onx.SerializeToString())
+    print(f"💾 Saved ONNX model to {path}")
+    return path
+
+def export_treelite(model, path='./model_tl.so'):
+    """Compile the trained forest to a native shared library with Treelite"""
+    try:
+        import treelite
+        import tl2cgen
+    except ImportError:
+        print("⚠️ treelite/tl2cgen not installed, skipping native compilation")
+        return None
+    
+    tl_model = treelite.sklearn.import_model(model)
+    tl2cgen.export_lib(tl_model, toolchain='gcc', libpath=path, params={'parallel_comp': 8})
+    print(f"💾 Saved compiled Treelite model to {path}")
+    return path
+
+def file_blake2b(path):
+    """Hex BLAKE2b digest of a file, read in chunks"""
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 def train_model():
     """Train the mental health risk prediction model"""
@@ -119,34 +163,31 @@ def train_model():
         X, y, test_size=0.2, random_state=42, stratify=y
     )
     
-    # Scale the features
-    print("🔄 Scaling features...")
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-    
-    # Train the model
+    # Train the model on raw features: tree splits are unaffected by per-feature
+    # scaling, and raw thresholds keep the sklearn, ONNX and Treelite exports identical
     print("🔄 Training Random Forest model...")
+    n_estimators = int(os.environ.get('N_ESTIMATORS', 50))
     model = RandomForestClassifier(
-        n_estimators=100,
+        n_estimators=n_estimators,
         max_depth=10,
         min_samples_split=5,
         min_samples_leaf=2,
+        n_jobs=-1,  # parallel at train time only; the API predicts with n_jobs=1
         random_state=42
     )
     
-    model.fit(X_train_scaled, y_train)
+    model.fit(X_train, y_train)
     
     # Evaluate the model
     print("📊 Evaluating model...")
-    train_score = model.score(X_train_scaled, y_train)
-    test_score = model.score(X_test_scaled, y_test)
+    train_score = model.score(X_train, y_train)
+    test_score = model.score(X_test, y_test)
     
     print(f"Training accuracy: {train_score:.3f}")
     print(f"Testing accuracy: {test_score:.3f}")
     
     # Predictions
-    y_pred = model.predict(X_test_scaled)
+    y_pred = model.predict(X_test)
     
     # Classification report
     print("\n📊 Classification Report:")
@@ -168,13 +209,22 @@ def train_model():
     for feature, imp in feature_importance:
         print(f"{feature}: {imp:.3f}")
     
-    # Save the model and scaler
-    print("💾 Saving model and scaler...")
-    joblib.dump(model, 'model.pkl')
-    joblib.dump(scaler, 'scaler.pkl')
+    # Save the model
+    print("💾 Saving model...")
+    # Compressed: the API loads it fully, since sklearn copies tree nodes out of any mmap
+    joblib.dump(model, 'model.pkl', compress=3)
+    print(f"🔑 model.pkl blake2b (set as MODEL_BLAKE2): {file_blake2b('model.pkl')}")
+    
+    onnx_path = export_onnx(model)
+    if onnx_path:
+        print(f"🔑 {onnx_path} blake2b (set as MODEL_ONNX_BLAKE2): {file_blake2b(onnx_path)}")
+    
+    treelite_path = export_treelite(model)
+    if treelite_path:
+        print(f"🔑 {treelite_path} blake2b (set as MODEL_TL_BLAKE2): {file_blake2b(treelite_path)}")
     
     print("✅ Model training completed successfully!")
-    return model, scaler
+    return model
 
 if __name__ == '__main__':
     train_model()
\ No newline at end of file